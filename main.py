@@ -4,15 +4,28 @@ Slate Integrations - IP Route Manager
 A modern Tkinter-based GUI application for managing Windows IPv4 routes.
 """
 
+import argparse
+import base64
 import tkinter as tk
 from tkinter import ttk, messagebox
 import subprocess
 import re
+import socket
+import struct
+import sys
 import json
+import locale
 import os
 import ctypes
 import threading
-import itertools
+import queue
+import atexit
+import codecs
+import collections
+import functools
+import tempfile
+import time
+from dataclasses import dataclass
 from datetime import datetime
 from typing import List, Dict, Optional
 
@@ -29,9 +42,30 @@ try:
 except ImportError:
     HAS_PYSERIAL = False
 
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
+try:
+    import pythoncom
+    import win32com.client
+    HAS_WIN32COM = True
+except ImportError:
+    HAS_WIN32COM = False
+
 APP_TITLE = "Slate Integrations - IP Manager"
 ADDED_ROUTES_FILE = "added_routes.json"
 LOG_FILE = "route_manager.log"
+SERIAL_PORTS_TTL = 2.0
+NIC_CACHE_TTL = 5.0
+IFACE_CACHE_TTL = 30.0
+ROUTE_EVENT_POLL_MS = 200
+LOG_BATCH_INTERVAL = 0.02
+LOG_BATCH_BYTES = 64 * 1024
+BACKGROUND_WORKERS = 4
+_NO_WINDOW = getattr(subprocess, "CREATE_NO_WINDOW", 0)
 
 BG_DARK = "#0a0a0a"
 BG_CARD = "#141414"
@@ -45,6 +79,24 @@ BORDER_COLOR = "#262626"
 GRADIENT_START = "#14b8a6"
 GRADIENT_END = "#06b6d4"
 
+_ROUTE_LINE = re.compile(
+    r'^[ \t]*(\d+\.\d+\.\d+\.\d+)[ \t]+(\d+\.\d+\.\d+\.\d+)[ \t]+(\S.*?)[ \t]+(\d+\.\d+\.\d+\.\d+)[ \t]+(\d+)[ \t\r]*$',
+    re.M
+)
+_PERSISTENT_LINE = re.compile(r'^[ \t]*(\d+\.\d+\.\d+\.\d+)[ \t]', re.M)
+_SPECIAL_DESTS = frozenset({'0.0.0.0', '127.0.0.0', '127.0.0.1', '224.0.0.0', '255.255.255.255'})
+
+
+@dataclass
+class Route:
+    __slots__ = ('destination', 'netmask', 'gateway', 'interface', 'metric', 'persistent')
+    destination: str
+    netmask: str
+    gateway: str
+    interface: str
+    metric: str
+    persistent: str
+
 
 def is_admin() -> bool:
     try:
@@ -53,56 +105,382 @@ def is_admin() -> bool:
         return False
 
 
+IS_ADMIN = is_admin()
+
+
+class _SOCKADDR_IN(ctypes.Structure):
+    _fields_ = [
+        ("sin_family", ctypes.c_ushort),
+        ("sin_port", ctypes.c_ushort),
+        ("sin_addr", ctypes.c_ubyte * 4),
+        ("sin_zero", ctypes.c_char * 8),
+    ]
+
+
+class _SOCKET_ADDRESS(ctypes.Structure):
+    _fields_ = [
+        ("lpSockaddr", ctypes.POINTER(_SOCKADDR_IN)),
+        ("iSockaddrLength", ctypes.c_int),
+    ]
+
+
+class _IP_ADAPTER_UNICAST_ADDRESS(ctypes.Structure):
+    pass
+
+
+_IP_ADAPTER_UNICAST_ADDRESS._fields_ = [
+    ("Length", ctypes.c_uint32),
+    ("Flags", ctypes.c_uint32),
+    ("Next", ctypes.POINTER(_IP_ADAPTER_UNICAST_ADDRESS)),
+    ("Address", _SOCKET_ADDRESS),
+]
+
+
+class _IP_ADAPTER_ADDRESSES(ctypes.Structure):
+    pass
+
+
+_IP_ADAPTER_ADDRESSES._fields_ = [
+    ("Length", ctypes.c_uint32),
+    ("IfIndex", ctypes.c_uint32),
+    ("Next", ctypes.POINTER(_IP_ADAPTER_ADDRESSES)),
+    ("AdapterName", ctypes.c_char_p),
+    ("FirstUnicastAddress", ctypes.POINTER(_IP_ADAPTER_UNICAST_ADDRESS)),
+    ("FirstAnycastAddress", ctypes.c_void_p),
+    ("FirstMulticastAddress", ctypes.c_void_p),
+    ("FirstDnsServerAddress", ctypes.c_void_p),
+    ("DnsSuffix", ctypes.c_wchar_p),
+    ("Description", ctypes.c_wchar_p),
+    ("FriendlyName", ctypes.c_wchar_p),
+    ("PhysicalAddress", ctypes.c_ubyte * 8),
+    ("PhysicalAddressLength", ctypes.c_uint32),
+    ("Flags", ctypes.c_uint32),
+    ("Mtu", ctypes.c_uint32),
+    ("IfType", ctypes.c_uint32),
+    ("OperStatus", ctypes.c_int),
+]
+
+_GAA_FLAG_SKIP_ANYCAST = 0x2
+_GAA_FLAG_SKIP_MULTICAST = 0x4
+_GAA_FLAG_SKIP_DNS_SERVER = 0x8
+_ERROR_BUFFER_OVERFLOW = 111
+_IF_OPER_STATUS_UP = 1
+
+
+class _SOCKADDR_INET(ctypes.Union):
+    _fields_ = [
+        ("Ipv4", _SOCKADDR_IN),
+        ("si_family", ctypes.c_ushort),
+        ("_storage", ctypes.c_uint32 * 7),
+    ]
+
+
+class _IP_ADDRESS_PREFIX(ctypes.Structure):
+    _fields_ = [
+        ("Prefix", _SOCKADDR_INET),
+        ("PrefixLength", ctypes.c_ubyte),
+    ]
+
+
+class _MIB_IPFORWARD_ROW2(ctypes.Structure):
+    _fields_ = [
+        ("InterfaceLuid", ctypes.c_uint64),
+        ("InterfaceIndex", ctypes.c_uint32),
+        ("DestinationPrefix", _IP_ADDRESS_PREFIX),
+        ("NextHop", _SOCKADDR_INET),
+        ("SitePrefixLength", ctypes.c_ubyte),
+        ("ValidLifetime", ctypes.c_uint32),
+        ("PreferredLifetime", ctypes.c_uint32),
+        ("Metric", ctypes.c_uint32),
+        ("Protocol", ctypes.c_int),
+        ("Loopback", ctypes.c_ubyte),
+        ("AutoconfigureAddress", ctypes.c_ubyte),
+        ("Publish", ctypes.c_ubyte),
+        ("Immortal", ctypes.c_ubyte),
+        ("Age", ctypes.c_uint32),
+        ("Origin", ctypes.c_int),
+    ]
+
+
+_ERROR_NOT_SUPPORTED = 50
+_MIB_IPPROTO_NETMGMT = 3
+# route.exe gives routes added without METRIC a route metric of 1 on top of the interface metric.
+_ROUTE_EXE_METRIC = 1
+
+
+def _set_sockaddr_inet(addr: _SOCKADDR_INET, ip: str):
+    addr.Ipv4.sin_family = socket.AF_INET
+    addr.Ipv4.sin_addr[:] = socket.inet_aton(ip)
+
+
+@functools.lru_cache(maxsize=None)
+def _iphlpapi():
+    iphlpapi = ctypes.windll.iphlpapi
+    iphlpapi.InitializeIpForwardEntry.argtypes = (ctypes.POINTER(_MIB_IPFORWARD_ROW2),)
+    iphlpapi.InitializeIpForwardEntry.restype = None
+    iphlpapi.CreateIpForwardEntry2.argtypes = (ctypes.POINTER(_MIB_IPFORWARD_ROW2),)
+    iphlpapi.CreateIpForwardEntry2.restype = ctypes.c_ulong
+    return iphlpapi
+
+
+def create_ip_forward_entry(dest: str, mask: str, gateway: str, ifindex: int) -> Optional[int]:
+    try:
+        iphlpapi = _iphlpapi()
+    except AttributeError:
+        return None
+    
+    row = _MIB_IPFORWARD_ROW2()
+    iphlpapi.InitializeIpForwardEntry(ctypes.byref(row))
+    row.InterfaceIndex = ifindex
+    _set_sockaddr_inet(row.DestinationPrefix.Prefix, dest)
+    row.DestinationPrefix.PrefixLength = bin(struct.unpack('!I', socket.inet_aton(mask))[0]).count('1')
+    _set_sockaddr_inet(row.NextHop, gateway)
+    row.Protocol = _MIB_IPPROTO_NETMGMT
+    row.Metric = _ROUTE_EXE_METRIC
+    return iphlpapi.CreateIpForwardEntry2(ctypes.byref(row))
+
+
+@functools.lru_cache(maxsize=256)
 def validate_ipv4(ip: str) -> bool:
-    pattern = r'^(\d{1,3})\.(\d{1,3})\.(\d{1,3})\.(\d{1,3})$'
-    match = re.match(pattern, ip.strip())
-    if not match:
+    # inet_pton only accepts strict dotted-quad; inet_aton would also take
+    # shorthand ("10.1"), hex/octal octets and trailing garbage.
+    try:
+        socket.inet_pton(socket.AF_INET, ip.strip())
+    except (OSError, ValueError):
         return False
-    for octet in match.groups():
-        if int(octet) > 255:
-            return False
     return True
 
 
+@functools.lru_cache(maxsize=256)
 def validate_subnet_mask(mask: str) -> bool:
-    if not validate_ipv4(mask):
-        return False
-    octets = [int(x) for x in mask.strip().split('.')]
-    binary = ''.join(format(o, '08b') for o in octets)
-    if '01' in binary:
+    try:
+        packed = socket.inet_pton(socket.AF_INET, mask.strip())
+    except (OSError, ValueError):
         return False
-    return True
+    inv = ~struct.unpack('!I', packed)[0] & 0xFFFFFFFF
+    return inv & (inv + 1) == 0
 
 
-def log_command(command: str, stdout: str, stderr: str, success: bool):
-    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+def prefix_to_netmask(prefix: int) -> str:
+    mask = (0xFFFFFFFF << (32 - prefix)) & 0xFFFFFFFF
+    return socket.inet_ntoa(struct.pack('!I', mask))
+
+
+_log_queue = queue.SimpleQueue()
+
+
+def _format_log_record(when: datetime, success: bool, command: str, stdout: str, stderr: str) -> List[str]:
     status = "SUCCESS" if success else "FAILED"
-    with open(LOG_FILE, "a", encoding="utf-8") as f:
-        f.write(f"\n{'='*60}\n")
-        f.write(f"[{timestamp}] {status}\n")
-        f.write(f"Command: {command}\n")
-        if stdout.strip():
-            f.write(f"STDOUT:\n{stdout}\n")
-        if stderr.strip():
-            f.write(f"STDERR:\n{stderr}\n")
+    parts = [f"\n{'='*60}\n", f"[{when.strftime('%Y-%m-%d %H:%M:%S')}] {status}\n", f"Command: {command}\n"]
+    if stdout.strip():
+        parts.append(f"STDOUT:\n{stdout}\n")
+    if stderr.strip():
+        parts.append(f"STDERR:\n{stderr}\n")
+    return parts
+
+
+def _log_write_failed(error: Exception):
+    if sys.stderr is not None:
+        sys.stderr.write(f"Logging disabled, cannot write {LOG_FILE}: {error}\n")
+
+
+def _log_writer():
+    try:
+        f = open(LOG_FILE, "a", encoding="utf-8")
+    except OSError as e:
+        _log_write_failed(e)
+        f = None
+    try:
+        stopping = False
+        while not stopping:
+            record = _log_queue.get()
+            deadline = time.monotonic() + LOG_BATCH_INTERVAL
+            parts = []
+            size = 0
+            while True:
+                if record is None:
+                    stopping = True
+                    break
+                record_parts = _format_log_record(*record)
+                parts.extend(record_parts)
+                size += sum(len(p) for p in record_parts)
+                remaining = deadline - time.monotonic()
+                if size >= LOG_BATCH_BYTES or remaining <= 0:
+                    break
+                try:
+                    record = _log_queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+            if parts and f is not None:
+                try:
+                    f.write(''.join(parts))
+                    f.flush()
+                except OSError as e:
+                    _log_write_failed(e)
+                    try:
+                        f.close()
+                    except OSError:
+                        pass
+                    f = None
+    finally:
+        if f is not None:
+            f.close()
+
+
+_log_thread = None
+_log_thread_lock = threading.Lock()
+
+
+def _start_log_writer():
+    global _log_thread
+    with _log_thread_lock:
+        if _log_thread is None:
+            _log_thread = threading.Thread(target=_log_writer, daemon=True)
+            _log_thread.start()
+            atexit.register(_stop_log_writer)
+
+
+def _stop_log_writer():
+    _log_queue.put(None)
+    _log_thread.join(timeout=2)
+
+
+def log_command(command: str, stdout: str, stderr: str, success: bool):
+    if _log_thread is None:
+        _start_log_writer()
+    _log_queue.put((datetime.now(), success, command, stdout, stderr))
+
+
+def json_loads(data):
+    if HAS_ORJSON:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def json_dumps(obj) -> bytes:
+    if HAS_ORJSON:
+        return orjson.dumps(obj)
+    return json.dumps(obj, separators=(',', ':')).encode("utf-8")
 
 
 def load_added_routes() -> List[Dict]:
     if os.path.exists(ADDED_ROUTES_FILE):
         try:
-            with open(ADDED_ROUTES_FILE, "r", encoding="utf-8") as f:
-                return json.load(f)
+            with open(ADDED_ROUTES_FILE, "rb") as f:
+                return json_loads(f.read())
         except Exception:
             return []
     return []
 
 
 def save_added_routes(routes: List[Dict]):
-    with open(ADDED_ROUTES_FILE, "w", encoding="utf-8") as f:
-        json.dump(routes, f, indent=2)
+    tmp_file = ADDED_ROUTES_FILE + ".tmp"
+    with open(tmp_file, "wb") as f:
+        f.write(json_dumps(routes))
+    os.replace(tmp_file, ADDED_ROUTES_FILE)
+
+
+def run_netsh_script(commands: List[str]) -> subprocess.CompletedProcess:
+    fd, path = tempfile.mkstemp(prefix="netsh_", suffix=".txt")
+    try:
+        script = "\n".join(commands) + "\n"
+        try:
+            data = script.encode(locale.getpreferredencoding(False))
+        except UnicodeEncodeError:
+            data = script.encode("utf-16")
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        return subprocess.run(["netsh", "-f", path], capture_output=True, text=True, timeout=30, creationflags=_NO_WINDOW)
+    finally:
+        os.remove(path)
+
+
+class PowerShellSession:
+    SENTINEL = b"__SLATE_PS_DONE__"
+    
+    def __init__(self):
+        self._proc = None
+        self._lines = None
+        self._lock = threading.Lock()
+    
+    def _start(self):
+        self._proc = subprocess.Popen(
+            ["powershell", "-NoProfile", "-NonInteractive", "-Command", "-"],
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+            creationflags=_NO_WINDOW
+        )
+        self._lines = queue.SimpleQueue()
+        threading.Thread(target=self._read_lines, args=(self._proc.stdout, self._lines), daemon=True).start()
+    
+    @staticmethod
+    def _read_lines(stdout, lines):
+        for line in iter(stdout.readline, b""):
+            lines.put(line)
+        lines.put(None)
+    
+    def run(self, script: str, timeout: float = 30) -> bytes:
+        # -Command - executes stdin line by line, so the script goes over as
+        # one encoded line followed by a sentinel marking the end of its output.
+        encoded = base64.b64encode(script.encode("utf-16-le")).decode("ascii")
+        command = (
+            f"iex ([Text.Encoding]::Unicode.GetString([Convert]::FromBase64String('{encoded}')))\n"
+            f"Write-Output '{self.SENTINEL.decode()}'\n"
+        )
+        
+        with self._lock:
+            if self._proc is None or self._proc.poll() is not None:
+                self._start()
+            self._proc.stdin.write(command.encode("ascii"))
+            self._proc.stdin.flush()
+            
+            output = []
+            deadline = time.monotonic() + timeout
+            while True:
+                try:
+                    line = self._lines.get(timeout=max(0.0, deadline - time.monotonic()))
+                except queue.Empty:
+                    self._stop()
+                    raise subprocess.TimeoutExpired("powershell", timeout)
+                if line is None:
+                    self._stop()
+                    raise RuntimeError("PowerShell session exited unexpectedly")
+                if line.rstrip(b"\r\n") == self.SENTINEL:
+                    return b"".join(output)
+                output.append(line)
+    
+    def _stop(self):
+        proc, self._proc = self._proc, None
+        if proc is None:
+            return
+        try:
+            proc.stdin.close()
+            proc.wait(timeout=1)
+        except Exception:
+            proc.kill()
+    
+    def close(self):
+        # Called at exit without the lock: a run() stuck on a hung script
+        # must not hold up shutdown, and killing the process unblocks it.
+        proc, self._proc = self._proc, None
+        if proc is not None:
+            proc.kill()
+
+
+_serialcomm_key = None
+
+
+def _close_serialcomm_key():
+    global _serialcomm_key
+    key, _serialcomm_key = _serialcomm_key, None
+    if key is not None:
+        try:
+            winreg.CloseKey(key)
+        except OSError:
+            pass
 
 
 def discover_serial_ports() -> List[Dict]:
+    global _serialcomm_key
     ports = []
     
     if HAS_PYSERIAL:
@@ -123,39 +501,66 @@ def discover_serial_ports() -> List[Dict]:
     
     if HAS_WINREG:
         try:
-            path = r'HARDWARE\DEVICEMAP\SERIALCOMM'
-            key = winreg.OpenKey(winreg.HKEY_LOCAL_MACHINE, path)
-            for i in itertools.count():
-                try:
-                    val = winreg.EnumValue(key, i)
-                    port_name = str(val[1])
-                    device_name = str(val[0]).replace('\\Device\\', '')
-                    ports.append({
-                        'device': port_name,
-                        'name': port_name,
-                        'description': device_name,
-                        'hwid': '',
-                        'manufacturer': '',
-                        'vid': '',
-                        'pid': ''
-                    })
-                except EnvironmentError:
-                    break
-            winreg.CloseKey(key)
+            if _serialcomm_key is None:
+                path = r'HARDWARE\DEVICEMAP\SERIALCOMM'
+                _serialcomm_key = winreg.OpenKey(winreg.HKEY_LOCAL_MACHINE, path)
+            _, value_count, _ = winreg.QueryInfoKey(_serialcomm_key)
+            for i in range(value_count):
+                name, data, _ = winreg.EnumValue(_serialcomm_key, i)
+                port_name = str(data)
+                device_name = str(name).replace('\\Device\\', '')
+                ports.append({
+                    'device': port_name,
+                    'name': port_name,
+                    'description': device_name,
+                    'hwid': '',
+                    'manufacturer': '',
+                    'vid': '',
+                    'pid': ''
+                })
         except Exception:
-            pass
+            _close_serialcomm_key()
     
     return ports
 
 
+if HAS_WINREG:
+    atexit.register(_close_serialcomm_key)
+
+
+_serial_ports_nonce = 0
+
+
+@functools.lru_cache(maxsize=1)
+def _cached_serial_ports(time_bucket: int, nonce: int) -> List[Dict]:
+    return discover_serial_ports()
+
+
+def get_serial_ports(force: bool = False) -> List[Dict]:
+    global _serial_ports_nonce
+    if force:
+        _serial_ports_nonce += 1
+    return _cached_serial_ports(int(time.monotonic() / SERIAL_PORTS_TTL), _serial_ports_nonce)
+
+
 class SerialTerminal(tk.Toplevel):
-    def __init__(self, parent, port_info: Dict):
+    if HAS_PYSERIAL:
+        _PARITY = {"None": serial.PARITY_NONE, "Even": serial.PARITY_EVEN, "Odd": serial.PARITY_ODD}
+        _STOPBITS = {"1": serial.STOPBITS_ONE, "1.5": serial.STOPBITS_ONE_POINT_FIVE, "2": serial.STOPBITS_TWO}
+    
+    def __init__(self, parent, port_info: Dict, max_lines: int = 2000):
         super().__init__(parent)
         self.port_info = port_info
         self.port_name = port_info.get('device', 'COM1')
         self.serial_conn: Optional[serial.Serial] = None
         self.running = False
         self.read_thread = None
+        self.max_lines = max_lines
+        self._pending_output = []
+        self._flush_job = None
+        self._rx_buf = collections.deque()
+        self._rx_pending = False
+        self._rx_decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
         
         self.title(f"Serial Console - {self.port_name}")
         self.geometry("700x500")
@@ -209,7 +614,7 @@ class SerialTerminal(tk.Toplevel):
         terminal_frame = tk.Frame(self, bg=BG_CARD, highlightbackground=BORDER_COLOR, highlightthickness=1)
         terminal_frame.pack(fill=tk.BOTH, expand=True, padx=20, pady=(0, 10))
         
-        self.output_text = tk.Text(terminal_frame, bg=BG_CARD, fg=TEXT_WHITE, insertbackground=ACCENT_TEAL, font=("Consolas", 10), relief=tk.FLAT, wrap=tk.WORD)
+        self.output_text = tk.Text(terminal_frame, bg=BG_CARD, fg=TEXT_WHITE, insertbackground=ACCENT_TEAL, font=("Consolas", 10), relief=tk.FLAT, wrap=tk.WORD, state=tk.DISABLED)
         scrollbar = ttk.Scrollbar(terminal_frame, orient=tk.VERTICAL, command=self.output_text.yview)
         self.output_text.configure(yscrollcommand=scrollbar.set)
         
@@ -237,11 +642,33 @@ class SerialTerminal(tk.Toplevel):
             self.append_output("\nWARNING: pyserial not installed. Install with: pip install pyserial\n", "error")
     
     def append_output(self, text: str, tag: str = "received"):
-        self.output_text.insert(tk.END, text, tag)
+        self._pending_output.append((text, tag))
+        if self._flush_job is None:
+            self._flush_job = self.after_idle(self._flush_output)
+    
+    def _flush_output(self):
+        if self._flush_job is not None:
+            self.after_cancel(self._flush_job)
+            self._flush_job = None
+        if not self._pending_output:
+            return
+        chunks = []
+        for text, tag in self._pending_output:
+            chunks.extend((text, tag))
+        self._pending_output = []
+        self.output_text.configure(state=tk.NORMAL)
+        self.output_text.insert(tk.END, *chunks)
+        
+        line_count = int(self.output_text.index("end-1c").split('.')[0])
+        if line_count > self.max_lines:
+            self.output_text.delete("1.0", f"{line_count - self.max_lines + 1}.0")
+        self.output_text.configure(state=tk.DISABLED)
         self.output_text.see(tk.END)
     
     def clear_output(self):
+        self.output_text.configure(state=tk.NORMAL)
         self.output_text.delete(1.0, tk.END)
+        self.output_text.configure(state=tk.DISABLED)
     
     def toggle_connection(self):
         if self.serial_conn and self.serial_conn.is_open:
@@ -257,10 +684,8 @@ class SerialTerminal(tk.Toplevel):
         try:
             baud = int(self.baud_var.get())
             databits = int(self.databits_var.get())
-            parity_map = {"None": serial.PARITY_NONE, "Even": serial.PARITY_EVEN, "Odd": serial.PARITY_ODD}
-            parity = parity_map.get(self.parity_var.get(), serial.PARITY_NONE)
-            stopbits_map = {"1": serial.STOPBITS_ONE, "1.5": serial.STOPBITS_ONE_POINT_FIVE, "2": serial.STOPBITS_TWO}
-            stopbits = stopbits_map.get(self.stopbits_var.get(), serial.STOPBITS_ONE)
+            parity = self._PARITY.get(self.parity_var.get(), serial.PARITY_NONE)
+            stopbits = self._STOPBITS.get(self.stopbits_var.get(), serial.STOPBITS_ONE)
             
             self.serial_conn = serial.Serial(
                 port=self.port_name,
@@ -271,6 +696,7 @@ class SerialTerminal(tk.Toplevel):
                 timeout=0.1
             )
             
+            self._rx_decoder.reset()
             self.running = True
             self.read_thread = threading.Thread(target=self.read_serial, daemon=True)
             self.read_thread.start()
@@ -299,13 +725,27 @@ class SerialTerminal(tk.Toplevel):
     def read_serial(self):
         while self.running and self.serial_conn and self.serial_conn.is_open:
             try:
-                data = self.serial_conn.read(1024)
+                data = self.serial_conn.read(1)
                 if data:
-                    text = data.decode('utf-8', errors='replace')
-                    self.after(0, lambda t=text: self.append_output(t, "received"))
+                    waiting = self.serial_conn.in_waiting
+                    if waiting:
+                        data += self.serial_conn.read(waiting)
+                    self._rx_buf.append(data)
+                    if not self._rx_pending:
+                        self._rx_pending = True
+                        self.after_idle(self._flush_rx)
             except Exception:
                 break
     
+    def _flush_rx(self):
+        self._rx_pending = False
+        chunks = []
+        while self._rx_buf:
+            chunks.append(self._rx_buf.popleft())
+        if chunks:
+            self._pending_output.append((self._rx_decoder.decode(b''.join(chunks)), "received"))
+            self._flush_output()
+    
     def send_data(self, event=None):
         if not self.serial_conn or not self.serial_conn.is_open:
             messagebox.showwarning("Not Connected", "Connect to the serial port first.")
@@ -322,6 +762,9 @@ class SerialTerminal(tk.Toplevel):
     
     def on_close(self):
         self.disconnect()
+        if self._flush_job is not None:
+            self.after_cancel(self._flush_job)
+            self._flush_job = None
         self.destroy()
 
 
@@ -335,22 +778,23 @@ class SlateButton(tk.Canvas):
         self.height = height
         self.hover = False
         
-        self.draw_button()
+        if self.style == "filled":
+            self._bg_id = self.create_rounded_rect(0, 0, self.width, self.height, 20, fill=ACCENT_TEAL, outline="")
+            self._text_id = self.create_text(self.width//2, self.height//2, text=self.text, fill=TEXT_WHITE, font=("Segoe UI", 10, "bold"))
+        else:
+            self._bg_id = self.create_rounded_rect(2, 2, self.width-2, self.height-2, 20, fill="", outline=TEXT_GRAY, width=1)
+            self._text_id = self.create_text(self.width//2, self.height//2, text=self.text, fill=TEXT_WHITE, font=("Segoe UI", 10))
+        
         self.bind("<Button-1>", self.on_click)
         self.bind("<Enter>", self.on_enter)
         self.bind("<Leave>", self.on_leave)
     
     def draw_button(self):
-        self.delete("all")
-        
         if self.style == "filled":
-            fill_color = ACCENT_TEAL_HOVER if self.hover else ACCENT_TEAL
-            self.create_rounded_rect(0, 0, self.width, self.height, 20, fill=fill_color, outline="")
-            self.create_text(self.width//2, self.height//2, text=self.text, fill=TEXT_WHITE, font=("Segoe UI", 10, "bold"))
+            self.itemconfigure(self._bg_id, fill=ACCENT_TEAL_HOVER if self.hover else ACCENT_TEAL)
         else:
-            outline_color = TEXT_WHITE if self.hover else TEXT_GRAY
-            self.create_rounded_rect(2, 2, self.width-2, self.height-2, 20, fill="", outline=outline_color, width=1)
-            self.create_text(self.width//2, self.height//2, text=self.text, fill=TEXT_WHITE, font=("Segoe UI", 10))
+            self.itemconfigure(self._bg_id, outline=TEXT_WHITE if self.hover else TEXT_GRAY)
+        self.itemconfigure(self._text_id, text=self.text)
     
     def create_rounded_rect(self, x1, y1, x2, y2, radius, **kwargs):
         points = [
@@ -390,8 +834,9 @@ class FeatureCard(tk.Frame):
 
 
 class RouteManagerApp:
-    def __init__(self, root: tk.Tk):
+    def __init__(self, root: tk.Tk, legacy: bool = False):
         self.root = root
+        self.legacy = legacy
         self.root.title(APP_TITLE)
         self.root.geometry("1100x800")
         self.root.minsize(1000, 700)
@@ -399,22 +844,89 @@ class RouteManagerApp:
         
         self.interfaces: List[Dict] = []
         self.added_routes: List[Dict] = load_added_routes()
-        self.is_admin = is_admin()
+        self.is_admin = IS_ADMIN
         self.auto_refresh_enabled = True
         self.auto_refresh_interval = 2000
         self.auto_refresh_job = None
+        self._visible = True
+        self._auto_refresh_paused = False
+        self._open_dialogs = 0
+        self._routes_changed = threading.Event()
+        self._route_notify = None
+        self._routes_busy = False
+        self._routes_stale = False
+        self._routes_waiters = []
         self.current_view = "routes"
-        self.all_routes_data = []
+        self.all_routes_data: List[Route] = []
+        self._routes_by_iid: Dict[str, tuple] = {}
+        self._console_rows: Dict[str, tuple] = {}
+        self._nic_rows: Dict[str, tuple] = {}
+        self._nic_by_iid: Dict[str, Dict] = {}
+        self._nic_cache = (0.0, None)
+        self._iface_cache = (0.0, None)
+        self._iface_display_cache = ([], {})
         self.current_filter = "all"
         self.serial_ports: List[Dict] = []
+        self._ports_busy = False
+        self._ports_rerun = False
+        self._results = queue.Queue()
+        self._tasks = queue.SimpleQueue()
+        for _ in range(BACKGROUND_WORKERS):
+            threading.Thread(target=self._background_worker, daemon=True).start()
+        self._ps = PowerShellSession()
+        atexit.register(self._ps.close)
         
         self.setup_styles()
         self.setup_ui()
+        self._drain_results()
+        self.root.bind("<Map>", self.on_root_map)
+        self.root.bind("<Unmap>", self.on_root_unmap)
+        self.start_route_watcher()
         self.refresh_interfaces()
         self.refresh_routes()
         self.refresh_serial_ports()
         self.start_auto_refresh()
     
+    def run_in_background(self, work, on_done=None):
+        def worker():
+            try:
+                result = work()
+            except Exception as e:
+                log_command(getattr(work, '__name__', 'background task'), "", str(e), False)
+                return
+            if on_done is not None:
+                self._results.put((on_done, result))
+        
+        self._tasks.put(worker)
+    
+    def _background_worker(self):
+        while True:
+            self._tasks.get()()
+    
+    def _call_async(self, work, on_done):
+        def call():
+            try:
+                return work()
+            except Exception as e:
+                return e
+        
+        self.run_in_background(call, on_done)
+    
+    def _run_async(self, cmd, on_done, **kw):
+        self._call_async(
+            functools.partial(subprocess.run, cmd, capture_output=True, text=True, timeout=30, creationflags=_NO_WINDOW, **kw),
+            on_done
+        )
+    
+    def _drain_results(self):
+        self.root.after(50, self._drain_results)
+        while True:
+            try:
+                on_done, result = self._results.get_nowait()
+            except queue.Empty:
+                break
+            on_done(result)
+    
     def setup_styles(self):
         style = ttk.Style()
         style.theme_use('clam')
@@ -456,12 +968,17 @@ class RouteManagerApp:
         style.map("Dark.TRadiobutton", background=[("active", BG_DARK)])
     
     def setup_ui(self):
+        self.root.withdraw()
+        
         main_container = tk.Frame(self.root, bg=BG_DARK)
         main_container.pack(fill=tk.BOTH, expand=True)
         
         self.create_header(main_container)
         self.create_hero(main_container)
         self.create_main_content(main_container)
+        
+        self.root.update_idletasks()
+        self.root.deiconify()
     
     def create_header(self, parent):
         header = tk.Frame(parent, bg=BG_DARK, height=60)
@@ -538,20 +1055,22 @@ class RouteManagerApp:
         main_tabs_frame = tk.Frame(controls_frame, bg=BG_DARK)
         main_tabs_frame.pack(side=tk.LEFT)
         
-        routes_tab = tk.Label(main_tabs_frame, text="Routes", bg=BG_CARD, fg=TEXT_WHITE, font=("Segoe UI", 11, "bold"), padx=20, pady=10, cursor="hand2")
-        routes_tab.pack(side=tk.LEFT, padx=(0, 5))
-        routes_tab.bind("<Button-1>", lambda e: self.switch_main_view("routes"))
-        self.main_tabs["routes"] = routes_tab
-        
-        console_tab = tk.Label(main_tabs_frame, text="Console", bg=BG_DARK, fg=TEXT_GRAY, font=("Segoe UI", 11), padx=20, pady=10, cursor="hand2")
-        console_tab.pack(side=tk.LEFT, padx=(0, 5))
-        console_tab.bind("<Button-1>", lambda e: self.switch_main_view("console"))
-        self.main_tabs["console"] = console_tab
+        for view_id, view_name in [("routes", "Routes"), ("console", "Console"), ("nic", "NIC Config")]:
+            tab = tk.Label(
+                main_tabs_frame,
+                text=view_name,
+                bg=BG_CARD if view_id == "routes" else BG_DARK,
+                fg=TEXT_WHITE if view_id == "routes" else TEXT_GRAY,
+                font=("Segoe UI", 11, "bold") if view_id == "routes" else ("Segoe UI", 11),
+                padx=20,
+                pady=10,
+                cursor="hand2"
+            )
+            tab.bind("<Button-1>", lambda e, v=view_id: self.switch_main_view(v))
+            self.main_tabs[view_id] = tab
         
-        nic_tab = tk.Label(main_tabs_frame, text="NIC Config", bg=BG_DARK, fg=TEXT_GRAY, font=("Segoe UI", 11), padx=20, pady=10, cursor="hand2")
-        nic_tab.pack(side=tk.LEFT, padx=(0, 20))
-        nic_tab.bind("<Button-1>", lambda e: self.switch_main_view("nic"))
-        self.main_tabs["nic"] = nic_tab
+        for column, tab in enumerate(self.main_tabs.values()):
+            tab.grid(row=0, column=column, padx=(0, 20 if column == len(self.main_tabs) - 1 else 5))
         
         self.tab_buttons = {}
         self.route_tabs_frame = tk.Frame(controls_frame, bg=BG_DARK)
@@ -568,10 +1087,12 @@ class RouteManagerApp:
                 pady=10,
                 cursor="hand2"
             )
-            btn.pack(side=tk.LEFT, padx=(0, 5))
             btn.bind("<Button-1>", lambda e, t=tab_id: self.switch_tab(t))
             self.tab_buttons[tab_id] = btn
         
+        for column, btn in enumerate(self.tab_buttons.values()):
+            btn.grid(row=0, column=column, padx=(0, 5))
+        
         right_controls = tk.Frame(controls_frame, bg=BG_DARK)
         right_controls.pack(side=tk.RIGHT)
         
@@ -723,24 +1244,41 @@ class RouteManagerApp:
             self.nic_view.pack(fill=tk.BOTH, expand=True)
             self.refresh_nic_configs()
     
-    def refresh_serial_ports(self):
-        self.serial_ports = discover_serial_ports()
-        
-        for item in self.console_tree.get_children():
-            self.console_tree.delete(item)
+    def refresh_serial_ports(self, force: bool = False):
+        if self._ports_busy:
+            self._ports_rerun = self._ports_rerun or force
+            return
+        self._ports_busy = True
+        self._call_async(functools.partial(get_serial_ports, force), self._serial_ports_done)
+    
+    def _serial_ports_done(self, ports):
+        self._ports_busy = False
+        if self._ports_rerun:
+            self._ports_rerun = False
+            self.refresh_serial_ports(force=True)
+        
+        if isinstance(ports, Exception):
+            log_command("serial port discovery", "", str(ports), False)
+            return
+        self.populate_serial_ports(ports)
+    
+    def populate_serial_ports(self, ports: List[Dict]):
+        self.serial_ports = ports
         
+        rows = {}
         for port in self.serial_ports:
             vid_pid = ""
             if port.get('vid') and port.get('pid'):
                 vid_pid = f"{port['vid']}:{port['pid']}"
             
-            self.console_tree.insert("", tk.END, values=(
+            rows[port.get('device', '')] = (
                 port.get('device', ''),
                 port.get('name', ''),
                 port.get('description', ''),
                 port.get('manufacturer', ''),
                 vid_pid
-            ))
+            )
+        self.sync_tree_rows(self.console_tree, rows, self._console_rows)
         
         count = len(self.serial_ports)
         self.console_count_label.configure(text=f"{count} port{'s' if count != 1 else ''}")
@@ -750,12 +1288,7 @@ class RouteManagerApp:
         if not selection:
             return
         
-        item = self.console_tree.item(selection[0])
-        values = item['values']
-        if not values:
-            return
-        
-        device = values[0]
+        device = selection[0]
         port_info = None
         for port in self.serial_ports:
             if port.get('device') == device:
@@ -765,31 +1298,99 @@ class RouteManagerApp:
         if port_info:
             SerialTerminal(self.root, port_info)
     
-    def refresh_nic_configs(self):
-        self.nic_configs = self.discover_nic_configs()
-        
-        for item in self.nic_tree.get_children():
-            self.nic_tree.delete(item)
-        
-        for nic in self.nic_configs:
-            dns_str = ", ".join(nic.get('dns', [])) if nic.get('dns') else ""
-            self.nic_tree.insert("", tk.END, values=(
-                nic.get('name', ''),
-                nic.get('status', ''),
-                "DHCP" if nic.get('dhcp') else "Static",
-                nic.get('ip', ''),
-                nic.get('subnet', ''),
-                nic.get('gateway', ''),
-                dns_str
-            ))
+    def refresh_nic_configs(self, force: bool = False):
+        cached_at, cached = self._nic_cache
+        if not force and cached is not None and time.monotonic() - cached_at < NIC_CACHE_TTL:
+            self.populate_nic_configs(cached)
+            return
+        self.run_in_background(self.discover_nic_configs, self._store_nic_configs)
+    
+    def _store_nic_configs(self, nics: List[Dict]):
+        self._nic_cache = (time.monotonic(), nics)
+        self.populate_nic_configs(nics)
+    
+    def populate_nic_configs(self, nics: List[Dict]):
+        self.nic_configs = nics
+        
+        self._nic_by_iid = {}
+        for position, nic in enumerate(nics):
+            iid = f"if{nic['index']}" if nic['index'] else f"pos{position}"
+            if iid in self._nic_by_iid:
+                iid = f"pos{position}"
+            self._nic_by_iid[iid] = nic
+        
+        rows = {
+            iid: (
+                nic['name'], nic['status'], "DHCP" if nic['dhcp'] else "Static",
+                nic['ip'], nic['subnet'], nic['gateway'], ", ".join(nic['dns'] or ())
+            )
+            for iid, nic in self._nic_by_iid.items()
+        }
+        self.sync_tree_rows(self.nic_tree, rows, self._nic_rows)
         
         count = len(self.nic_configs)
         self.nic_count_label.configure(text=f"{count} adapter{'s' if count != 1 else ''}")
     
     def discover_nic_configs(self) -> List[Dict]:
+        if HAS_WIN32COM:
+            nics = self.discover_nic_configs_wmi()
+            if nics:
+                return nics
+        return self.discover_nic_configs_powershell()
+    
+    def discover_nic_configs_wmi(self) -> List[Dict]:
+        nics = []
+        try:
+            pythoncom.CoInitialize()
+            try:
+                wmi = win32com.client.GetObject(r"winmgmts:\\.\root\cimv2")
+                configs = {}
+                for config in wmi.ExecQuery(
+                    "SELECT Index, IPAddress, IPSubnet, DefaultIPGateway, DNSServerSearchOrder, DHCPEnabled "
+                    "FROM Win32_NetworkAdapterConfiguration"
+                ):
+                    configs[config.Index] = config
+                
+                for adapter in wmi.ExecQuery(
+                    "SELECT Index, InterfaceIndex, NetConnectionID, NetConnectionStatus "
+                    "FROM Win32_NetworkAdapter WHERE NetConnectionStatus = 2 OR NetConnectionStatus = 7"
+                ):
+                    config = configs.get(adapter.Index)
+                    addresses = list(config.IPAddress or ()) if config else []
+                    subnets = list(config.IPSubnet or ()) if config else []
+                    gateways = list(config.DefaultIPGateway or ()) if config else []
+                    dns = list(config.DNSServerSearchOrder or ()) if config else []
+                    
+                    ip = ""
+                    subnet = ""
+                    for i, address in enumerate(addresses):
+                        if ':' not in address:
+                            ip = address
+                            subnet = subnets[i] if i < len(subnets) else ""
+                            break
+                    
+                    nics.append({
+                        'name': adapter.NetConnectionID or '',
+                        'status': "Up" if adapter.NetConnectionStatus == 2 else "Disconnected",
+                        'dhcp': bool(config.DHCPEnabled) if config else False,
+                        'ip': ip,
+                        'subnet': subnet,
+                        'gateway': next((g for g in gateways if ':' not in g), ""),
+                        'dns': [d for d in dns if ':' not in d],
+                        'index': adapter.InterfaceIndex or 0
+                    })
+            finally:
+                pythoncom.CoUninitialize()
+        except Exception as e:
+            log_command("WMI NIC discovery", "", str(e), False)
+        
+        return nics
+    
+    def discover_nic_configs_powershell(self) -> List[Dict]:
         nics = []
         try:
             ps_script = '''
+            [Console]::OutputEncoding = New-Object System.Text.UTF8Encoding $false
             $adapters = Get-NetAdapter | Where-Object { $_.Status -eq 'Up' -or $_.Status -eq 'Disconnected' }
             $result = @()
             foreach ($adapter in $adapters) {
@@ -803,23 +1404,12 @@ class RouteManagerApp:
                     $gateway = $ipConfig.IPv4DefaultGateway.NextHop
                 }
                 
-                $subnetMask = ""
-                if ($ipAddress) {
-                    $prefix = $ipAddress.PrefixLength
-                    $maskBinary = ('1' * $prefix).PadRight(32, '0')
-                    $octets = @()
-                    for ($i = 0; $i -lt 4; $i++) {
-                        $octets += [Convert]::ToInt32($maskBinary.Substring($i * 8, 8), 2)
-                    }
-                    $subnetMask = $octets -join '.'
-                }
-                
                 $obj = [PSCustomObject]@{
                     Name = $adapter.Name
                     Status = $adapter.Status
                     DHCP = if ($dhcp -eq 'Enabled') { $true } else { $false }
                     IP = if ($ipAddress) { $ipAddress.IPAddress } else { "" }
-                    Subnet = $subnetMask
+                    PrefixLength = if ($ipAddress) { [int]$ipAddress.PrefixLength } else { $null }
                     Gateway = $gateway
                     DNS = if ($dns) { $dns } else { @() }
                     Index = $adapter.ifIndex
@@ -829,23 +1419,20 @@ class RouteManagerApp:
             $result | ConvertTo-Json -Compress
             '''
             
-            result = subprocess.run(
-                ["powershell", "-NoProfile", "-Command", ps_script],
-                capture_output=True, text=True, timeout=30
-            )
-            
-            if result.returncode == 0 and result.stdout.strip():
-                data = json.loads(result.stdout.strip())
+            output = self._ps.run(ps_script).strip()
+            if output:
+                data = json_loads(output)
                 if isinstance(data, dict):
                     data = [data]
                 
                 for item in data:
+                    prefix = item.get('PrefixLength')
                     nics.append({
                         'name': item.get('Name', ''),
                         'status': item.get('Status', ''),
                         'dhcp': item.get('DHCP', False),
                         'ip': item.get('IP', ''),
-                        'subnet': item.get('Subnet', ''),
+                        'subnet': prefix_to_netmask(prefix) if prefix is not None else '',
                         'gateway': item.get('Gateway', ''),
                         'dns': item.get('DNS', []),
                         'index': item.get('Index', 0)
@@ -860,20 +1447,10 @@ class RouteManagerApp:
         if not selection:
             return
         
-        item = self.nic_tree.item(selection[0])
-        values = item['values']
-        if not values:
-            return
-        
-        nic_name = values[0]
-        nic_info = None
-        for nic in self.nic_configs:
-            if nic.get('name') == nic_name:
-                nic_info = nic
-                break
-        
+        nic_info = self._nic_by_iid.get(selection[0])
         if not nic_info:
             return
+        nic_name = nic_info.get('name', '')
         
         dialog = self.create_dialog(f"Configure: {nic_name}", 500, 520)
         
@@ -895,6 +1472,7 @@ class RouteManagerApp:
         
         static_frame = tk.Frame(main_frame, bg=BG_DARK)
         static_frame.pack(fill=tk.X, pady=(0, 15))
+        static_frame.columnconfigure(1, weight=1)
         
         entries = {}
         
@@ -903,15 +1481,7 @@ class RouteManagerApp:
             ("Subnet Mask", "subnet", nic_info.get('subnet', '')),
             ("Default Gateway", "gateway", nic_info.get('gateway', ''))
         ]:
-            row = tk.Frame(static_frame, bg=BG_DARK)
-            row.pack(fill=tk.X, pady=5)
-            
-            tk.Label(row, text=label_text, bg=BG_DARK, fg=TEXT_GRAY, font=("Segoe UI", 10), width=15, anchor=tk.W).pack(side=tk.LEFT)
-            
-            entry = tk.Entry(row, bg=BG_CARD, fg=TEXT_WHITE, insertbackground=TEXT_WHITE, font=("Segoe UI", 11), relief=tk.FLAT, highlightbackground=BORDER_COLOR, highlightthickness=1)
-            entry.pack(side=tk.LEFT, fill=tk.X, expand=True, ipady=8, padx=(10, 0))
-            entry.insert(0, default)
-            entries[key] = entry
+            entries[key] = self.add_form_row(static_frame, len(entries), label_text, default)
         
         dns_frame = tk.Frame(main_frame, bg=BG_DARK)
         dns_frame.pack(fill=tk.X, pady=(10, 0))
@@ -928,6 +1498,7 @@ class RouteManagerApp:
         
         dns_entries_frame = tk.Frame(main_frame, bg=BG_DARK)
         dns_entries_frame.pack(fill=tk.X, pady=(10, 0))
+        dns_entries_frame.columnconfigure(1, weight=1)
         
         dns_list = nic_info.get('dns', [])
         
@@ -935,23 +1506,23 @@ class RouteManagerApp:
             ("Primary DNS", dns_list[0] if len(dns_list) > 0 else ""),
             ("Secondary DNS", dns_list[1] if len(dns_list) > 1 else "")
         ]):
-            row = tk.Frame(dns_entries_frame, bg=BG_DARK)
-            row.pack(fill=tk.X, pady=5)
-            
-            tk.Label(row, text=label_text, bg=BG_DARK, fg=TEXT_GRAY, font=("Segoe UI", 10), width=15, anchor=tk.W).pack(side=tk.LEFT)
-            
-            entry = tk.Entry(row, bg=BG_CARD, fg=TEXT_WHITE, insertbackground=TEXT_WHITE, font=("Segoe UI", 11), relief=tk.FLAT, highlightbackground=BORDER_COLOR, highlightthickness=1)
-            entry.pack(side=tk.LEFT, fill=tk.X, expand=True, ipady=8, padx=(10, 0))
-            entry.insert(0, default)
-            entries[f"dns{i+1}"] = entry
+            entries[f"dns{i+1}"] = self.add_form_row(dns_entries_frame, i, label_text, default)
+        
+        field_states = {}
         
         def toggle_static_fields(*args):
             state = tk.NORMAL if ip_mode_var.get() == "static" else tk.DISABLED
+            if field_states.get("ip") == state:
+                return
+            field_states["ip"] = state
             for key in ["ip", "subnet", "gateway"]:
                 entries[key].configure(state=state)
         
         def toggle_dns_fields(*args):
             state = tk.NORMAL if dns_mode_var.get() == "manual" else tk.DISABLED
+            if field_states.get("dns") == state:
+                return
+            field_states["dns"] = state
             entries["dns1"].configure(state=state)
             entries["dns2"].configure(state=state)
         
@@ -961,83 +1532,103 @@ class RouteManagerApp:
         toggle_static_fields()
         toggle_dns_fields()
         
+        applying = [False]
+        
         def apply_config():
-            if not is_admin():
+            if not self.is_admin:
                 messagebox.showerror("Error", "Administrator privileges required to change NIC settings.")
                 return
             
             use_dhcp = ip_mode_var.get() == "dhcp"
             use_dns_auto = dns_mode_var.get() == "auto"
+            address_steps = []
+            dns_steps = []
             
-            try:
-                if use_dhcp:
-                    cmd = f'netsh interface ip set address "{nic_name}" dhcp'
-                    result = subprocess.run(cmd, shell=True, capture_output=True, text=True, timeout=30)
-                    log_command(cmd, result.stdout, result.stderr, result.returncode == 0)
-                    
-                    if result.returncode != 0:
-                        messagebox.showerror("Error", f"Failed to enable DHCP:\n{result.stderr}")
-                        return
+            if use_dhcp:
+                address_steps.append(f'interface ip set address "{nic_name}" dhcp')
+            else:
+                ip = entries["ip"].get().strip()
+                subnet = entries["subnet"].get().strip()
+                gateway = entries["gateway"].get().strip()
+                
+                if not validate_ipv4(ip):
+                    messagebox.showerror("Error", "Invalid IP address")
+                    return
+                if not validate_subnet_mask(subnet):
+                    messagebox.showerror("Error", "Invalid subnet mask")
+                    return
+                if gateway and not validate_ipv4(gateway):
+                    messagebox.showerror("Error", "Invalid gateway address")
+                    return
+                
+                if gateway:
+                    address_steps.append(f'interface ip set address "{nic_name}" static {ip} {subnet} {gateway}')
                 else:
-                    ip = entries["ip"].get().strip()
-                    subnet = entries["subnet"].get().strip()
-                    gateway = entries["gateway"].get().strip()
-                    
-                    if not validate_ipv4(ip):
-                        messagebox.showerror("Error", "Invalid IP address")
-                        return
-                    if not validate_subnet_mask(subnet):
-                        messagebox.showerror("Error", "Invalid subnet mask")
-                        return
-                    if gateway and not validate_ipv4(gateway):
-                        messagebox.showerror("Error", "Invalid gateway address")
+                    address_steps.append(f'interface ip set address "{nic_name}" static {ip} {subnet}')
+            
+            if use_dns_auto:
+                dns_steps.append(f'interface ip set dns "{nic_name}" dhcp')
+            else:
+                dns1 = entries["dns1"].get().strip()
+                dns2 = entries["dns2"].get().strip()
+                
+                if dns1 and not validate_ipv4(dns1):
+                    messagebox.showerror("Error", "Invalid primary DNS address")
+                    return
+                if dns2 and not validate_ipv4(dns2):
+                    messagebox.showerror("Error", "Invalid secondary DNS address")
+                    return
+                
+                if dns1:
+                    dns_steps.append(f'interface ip set dns "{nic_name}" static {dns1}')
+                if dns2:
+                    dns_steps.append(f'interface ip add dns "{nic_name}" {dns2} index=2')
+            
+            if applying[0]:
+                return
+            applying[0] = True
+            
+            def finish():
+                applying[0] = False
+                dialog.destroy()
+                self._nic_cache = (0.0, None)
+                self._iface_cache = (0.0, None)
+                self.root.after(2000, lambda: self.refresh_nic_configs(force=True))
+            
+            def run_group(name, commands, on_success, on_failure):
+                def group_done(result):
+                    if isinstance(result, Exception):
+                        log_command(f"apply_nic_config ({name})", "", str(result), False)
+                        on_failure("Command timed out" if isinstance(result, subprocess.TimeoutExpired) else str(result))
                         return
                     
-                    if gateway:
-                        cmd = f'netsh interface ip set address "{nic_name}" static {ip} {subnet} {gateway}'
-                    else:
-                        cmd = f'netsh interface ip set address "{nic_name}" static {ip} {subnet}'
-                    
-                    result = subprocess.run(cmd, shell=True, capture_output=True, text=True, timeout=30)
-                    log_command(cmd, result.stdout, result.stderr, result.returncode == 0)
-                    
+                    log_command(f"netsh -f ({name}): " + "; ".join(commands), result.stdout, result.stderr, result.returncode == 0)
                     if result.returncode != 0:
-                        messagebox.showerror("Error", f"Failed to set static IP:\n{result.stderr}")
-                        return
-                
-                if use_dns_auto:
-                    cmd = f'netsh interface ip set dns "{nic_name}" dhcp'
-                    result = subprocess.run(cmd, shell=True, capture_output=True, text=True, timeout=30)
-                    log_command(cmd, result.stdout, result.stderr, result.returncode == 0)
-                else:
-                    dns1 = entries["dns1"].get().strip()
-                    dns2 = entries["dns2"].get().strip()
-                    
-                    if dns1:
-                        if not validate_ipv4(dns1):
-                            messagebox.showerror("Error", "Invalid primary DNS address")
-                            return
-                        cmd = f'netsh interface ip set dns "{nic_name}" static {dns1}'
-                        result = subprocess.run(cmd, shell=True, capture_output=True, text=True, timeout=30)
-                        log_command(cmd, result.stdout, result.stderr, result.returncode == 0)
-                    
-                    if dns2:
-                        if not validate_ipv4(dns2):
-                            messagebox.showerror("Error", "Invalid secondary DNS address")
-                            return
-                        cmd = f'netsh interface ip add dns "{nic_name}" {dns2} index=2'
-                        result = subprocess.run(cmd, shell=True, capture_output=True, text=True, timeout=30)
-                        log_command(cmd, result.stdout, result.stderr, result.returncode == 0)
+                        on_failure(result.stderr or result.stdout)
+                    else:
+                        on_success()
                 
+                self._call_async(functools.partial(run_netsh_script, commands), group_done)
+            
+            def address_failed(output):
+                applying[0] = False
+                messagebox.showerror("Error", f"Failed to set IP address:\n{output}")
+            
+            def dns_failed(output):
+                messagebox.showwarning("Partially Applied", f"IP address settings were applied, but the DNS update failed:\n{output}")
+                finish()
+            
+            def all_applied():
                 messagebox.showinfo("Success", f"Network configuration updated for {nic_name}")
-                dialog.destroy()
-                self.root.after(2000, self.refresh_nic_configs)
-                
-            except subprocess.TimeoutExpired:
-                messagebox.showerror("Error", "Command timed out")
-            except Exception as e:
-                messagebox.showerror("Error", f"Failed to apply configuration:\n{e}")
-                log_command("apply_nic_config", "", str(e), False)
+                finish()
+            
+            def run_dns():
+                if dns_steps:
+                    run_group("DNS", dns_steps, all_applied, dns_failed)
+                else:
+                    all_applied()
+            
+            run_group("IP address", address_steps, run_dns, address_failed)
         
         btn_frame = tk.Frame(dialog, bg=BG_DARK)
         btn_frame.pack(pady=20)
@@ -1045,6 +1636,14 @@ class RouteManagerApp:
         SlateButton(btn_frame, "Apply", command=apply_config, style="filled", width=100, height=40).pack(side=tk.LEFT, padx=10)
         SlateButton(btn_frame, "Cancel", command=dialog.destroy, style="outline", width=100, height=40).pack(side=tk.LEFT, padx=10)
     
+    def add_form_row(self, parent, row: int, label_text: str, default: str = "") -> tk.Entry:
+        tk.Label(parent, text=label_text, bg=BG_DARK, fg=TEXT_GRAY, font=("Segoe UI", 10), width=15, anchor=tk.W).grid(row=row, column=0, sticky=tk.W, pady=5)
+        
+        entry = tk.Entry(parent, bg=BG_CARD, fg=TEXT_WHITE, insertbackground=TEXT_WHITE, font=("Segoe UI", 11), relief=tk.FLAT, highlightbackground=BORDER_COLOR, highlightthickness=1)
+        entry.grid(row=row, column=1, sticky=tk.EW, ipady=8, padx=(10, 0), pady=5)
+        entry.insert(0, default)
+        return entry
+    
     def switch_tab(self, tab_id):
         self.current_filter = tab_id
         for tid, btn in self.tab_buttons.items():
@@ -1056,34 +1655,56 @@ class RouteManagerApp:
     
     def update_tab_counts(self):
         all_count = len(self.all_routes_data)
-        persistent_count = sum(1 for r in self.all_routes_data if r.get('persistent') == 'Yes')
-        temporary_count = sum(1 for r in self.all_routes_data if r.get('persistent') == 'No')
+        persistent_count = sum(1 for r in self.all_routes_data if r.persistent == 'Yes')
+        temporary_count = sum(1 for r in self.all_routes_data if r.persistent == 'No')
         
         self.tab_buttons["all"].configure(text=f"All ({all_count})")
         self.tab_buttons["persistent"].configure(text=f"Persistent ({persistent_count})")
         self.tab_buttons["temporary"].configure(text=f"Temporary ({temporary_count})")
     
     def filter_routes(self):
-        for item in self.routes_tree.get_children():
-            self.routes_tree.delete(item)
-        
+        rows = {}
+        visible = []
         for route in self.all_routes_data:
-            if self.current_filter == "persistent" and route.get('persistent') != 'Yes':
-                continue
-            if self.current_filter == "temporary" and route.get('persistent') != 'No':
-                continue
-            
-            persistent_text = route.get('persistent', 'Unknown')
+            persistent_text = route.persistent
             type_display = "PERSISTENT" if persistent_text == "Yes" else ("TEMPORARY" if persistent_text == "No" else "SYSTEM")
             
-            self.routes_tree.insert("", tk.END, values=(
-                route.get('destination', ''),
-                route.get('netmask', ''),
-                route.get('gateway', ''),
-                route.get('interface', ''),
-                route.get('metric', ''),
+            values = (
+                route.destination,
+                route.netmask,
+                route.gateway,
+                route.interface,
+                route.metric,
                 type_display
-            ))
+            )
+            iid = "|".join(values[:4])
+            if iid in rows:
+                continue
+            rows[iid] = values
+            
+            if self.current_filter == "persistent" and persistent_text != 'Yes':
+                continue
+            if self.current_filter == "temporary" and persistent_text != 'No':
+                continue
+            visible.append(iid)
+        
+        self.sync_tree_rows(self.routes_tree, rows, self._routes_by_iid, visible)
+    
+    def sync_tree_rows(self, tree: ttk.Treeview, rows: Dict[str, tuple], shown: Dict[str, tuple], order: Optional[List[str]] = None):
+        for iid in [iid for iid in shown if iid not in rows]:
+            tree.delete(iid)
+            del shown[iid]
+        
+        for iid, values in rows.items():
+            if iid not in shown:
+                tree.insert("", tk.END, iid=iid, values=values)
+            elif shown[iid] != values:
+                tree.item(iid, values=values)
+            shown[iid] = values
+        
+        order = tuple(rows if order is None else order)
+        if tree.get_children() != order:
+            tree.set_children("", *order)
     
     def create_dialog(self, title, width=480, height=400):
         dialog = tk.Toplevel(self.root)
@@ -1093,6 +1714,9 @@ class RouteManagerApp:
         dialog.transient(self.root)
         dialog.grab_set()
         
+        self._open_dialogs += 1
+        dialog.bind("<Destroy>", lambda event: self.on_dialog_destroyed(event, dialog))
+        
         dialog_title = tk.Label(dialog, text=title, bg=BG_DARK, fg=TEXT_WHITE, font=("Segoe UI", 18, "bold"))
         dialog_title.pack(pady=(30, 25))
         
@@ -1127,15 +1751,7 @@ class RouteManagerApp:
         
         tk.Label(iface_row, text="Interface", bg=BG_DARK, fg=TEXT_GRAY, font=("Segoe UI", 10), width=12, anchor="w").pack(side=tk.LEFT)
         
-        interface_names = []
-        interface_map = {}
-        for iface in self.interfaces:
-            name = iface.get('name', 'Unknown')
-            ipv4 = iface.get('ipv4', '')
-            idx = iface.get('index', '')
-            display = f"{name}" + (f" ({ipv4})" if ipv4 else "")
-            interface_names.append(display)
-            interface_map[display] = {'index': idx, 'ipv4': ipv4}
+        interface_names, interface_map = self._iface_display_cache
         
         interface_var = tk.StringVar()
         interface_combo = ttk.Combobox(iface_row, textvariable=interface_var, values=interface_names, state="readonly", font=("Segoe UI", 10))
@@ -1163,7 +1779,12 @@ class RouteManagerApp:
         persist_check = ttk.Checkbutton(persist_frame, text="Make Persistent (survives reboot)", variable=persistent_var, style="Dark.TCheckbutton")
         persist_check.pack(anchor=tk.W)
         
+        adding = [False]
+        
         def do_add():
+            if adding[0]:
+                return
+            
             dest = entries["dest"].get().strip()
             mask = entries["mask"].get().strip()
             gateway = entries["gateway"].get().strip()
@@ -1179,6 +1800,11 @@ class RouteManagerApp:
             if not gateway or not validate_ipv4(gateway):
                 messagebox.showerror("Error", "Invalid gateway IP")
                 return
+            dest_bits = struct.unpack('!I', socket.inet_aton(dest))[0]
+            mask_bits = struct.unpack('!I', socket.inet_aton(mask))[0]
+            if dest_bits & mask_bits != dest_bits:
+                messagebox.showerror("Error", "Invalid route: (Destination & Mask) != Destination")
+                return
             
             if persistent:
                 if not messagebox.askyesno("Confirm", "This route will persist across reboots. Continue?"):
@@ -1189,9 +1815,25 @@ class RouteManagerApp:
             if ifindex:
                 cmd.extend(["IF", ifindex])
             
-            try:
-                result = subprocess.run(cmd, capture_output=True, text=True, timeout=30)
-                log_command(' '.join(cmd), result.stdout, result.stderr, result.returncode == 0)
+            local_ip = interface_map.get(interface_var.get(), {}).get('ipv4')
+            next_hop = "0.0.0.0" if gateway == local_ip else gateway
+            
+            def add_route():
+                if not persistent and ifindex:
+                    status = create_ip_forward_entry(dest, mask, next_hop, int(ifindex))
+                    if status is not None and status != _ERROR_NOT_SUPPORTED:
+                        label = f"CreateIpForwardEntry2 {dest} mask {mask} {gateway} IF {ifindex}"
+                        return subprocess.CompletedProcess(label, status, "", ctypes.FormatError(status) if status else "")
+                return subprocess.run(cmd, capture_output=True, text=True, timeout=30, creationflags=_NO_WINDOW)
+            
+            def add_done(result):
+                adding[0] = False
+                if isinstance(result, Exception):
+                    messagebox.showerror("Error", str(result))
+                    return
+                
+                command = result.args if isinstance(result.args, str) else ' '.join(result.args)
+                log_command(command, result.stdout, result.stderr, result.returncode == 0)
                 
                 if result.returncode == 0:
                     iface_name = interface_var.get().split(" (")[0] if interface_var.get() else "N/A"
@@ -1207,8 +1849,9 @@ class RouteManagerApp:
                     self.refresh_routes()
                 else:
                     messagebox.showerror("Error", result.stderr or result.stdout or "Failed to add route")
-            except Exception as e:
-                messagebox.showerror("Error", str(e))
+            
+            adding[0] = True
+            self._call_async(add_route, add_done)
         
         btn_frame = tk.Frame(dialog, bg=BG_DARK)
         btn_frame.pack(pady=25)
@@ -1240,7 +1883,12 @@ class RouteManagerApp:
             if values:
                 dest_entry.insert(0, values[0])
         
+        deleting = [False]
+        
         def do_delete():
+            if deleting[0]:
+                return
+            
             dest = dest_entry.get().strip()
             if not dest or not validate_ipv4(dest):
                 messagebox.showerror("Error", "Invalid destination IP")
@@ -1249,8 +1897,12 @@ class RouteManagerApp:
             if not messagebox.askyesno("Confirm", f"Delete route to {dest}?"):
                 return
             
-            try:
-                result = subprocess.run(["route", "delete", dest], capture_output=True, text=True, timeout=30)
+            def delete_done(result):
+                deleting[0] = False
+                if isinstance(result, Exception):
+                    messagebox.showerror("Error", str(result))
+                    return
+                
                 log_command(f"route delete {dest}", result.stdout, result.stderr, result.returncode == 0)
                 
                 if result.returncode == 0:
@@ -1259,8 +1911,9 @@ class RouteManagerApp:
                     self.refresh_routes()
                 else:
                     messagebox.showerror("Error", result.stderr or result.stdout or "Failed to delete route")
-            except Exception as e:
-                messagebox.showerror("Error", str(e))
+            
+            deleting[0] = True
+            self._run_async(["route", "delete", dest], delete_done)
         
         btn_frame = tk.Frame(dialog, bg=BG_DARK)
         btn_frame.pack(pady=30)
@@ -1287,27 +1940,27 @@ class RouteManagerApp:
         tree.column("state", width=100, anchor=tk.CENTER)
         tree.column("ipv4", width=150, anchor=tk.W)
         
-        for iface in self.interfaces:
-            tree.insert("", tk.END, values=(
-                iface.get('index', ''),
-                iface.get('name', ''),
-                iface.get('state', ''),
-                iface.get('ipv4', '')
-            ))
-        
-        tree.pack(fill=tk.BOTH, expand=True, padx=1, pady=1)
+        shown: Dict[str, tuple] = {}
         
-        def do_refresh():
-            for item in tree.get_children():
-                tree.delete(item)
-            self.refresh_interfaces()
-            for iface in self.interfaces:
-                tree.insert("", tk.END, values=(
+        def repopulate():
+            if not tree.winfo_exists():
+                return
+            rows = {
+                f"{iface.get('index', '')}|{iface.get('name', '')}": (
                     iface.get('index', ''),
                     iface.get('name', ''),
                     iface.get('state', ''),
                     iface.get('ipv4', '')
-                ))
+                )
+                for iface in self.interfaces
+            }
+            self.sync_tree_rows(tree, rows, shown)
+        
+        repopulate()
+        tree.pack(fill=tk.BOTH, expand=True, padx=1, pady=1)
+        
+        def do_refresh():
+            self.refresh_interfaces(on_done=repopulate, force=True)
         
         btn_frame = tk.Frame(dialog, bg=BG_DARK)
         btn_frame.pack(pady=(0, 20))
@@ -1352,32 +2005,96 @@ class RouteManagerApp:
             if messagebox.askyesno("Confirm", "Clear route history?"):
                 self.added_routes = []
                 save_added_routes([])
-                for item in tree.get_children():
-                    tree.delete(item)
+                tree.delete(*tree.get_children())
         
         btn_frame = tk.Frame(dialog, bg=BG_DARK)
         btn_frame.pack(pady=(0, 20))
         SlateButton(btn_frame, "Clear History", command=clear_history, style="outline", width=120, height=38).pack()
     
     def refresh_all(self):
-        self.refresh_interfaces()
+        self.refresh_interfaces(force=True)
         self.refresh_routes()
         if self.current_view == "console":
-            self.refresh_serial_ports()
+            self.refresh_serial_ports(force=True)
         elif self.current_view == "nic":
-            self.refresh_nic_configs()
+            self.refresh_nic_configs(force=True)
+    
+    def refresh_interfaces(self, on_done=None, force: bool = False):
+        cached_at, cached = self._iface_cache
+        if not force and cached is not None and time.monotonic() - cached_at < IFACE_CACHE_TTL:
+            self.interfaces = cached
+            if on_done:
+                on_done()
+            return
+        
+        def apply(interfaces):
+            self._iface_cache = (time.monotonic(), interfaces)
+            self.interfaces = interfaces
+            
+            interface_names = []
+            interface_map = {}
+            for iface in interfaces:
+                name = iface.get('name', 'Unknown')
+                ipv4 = iface.get('ipv4', '')
+                idx = iface.get('index', '')
+                display = f"{name}" + (f" ({ipv4})" if ipv4 else "")
+                interface_names.append(display)
+                interface_map[display] = {'index': idx, 'ipv4': ipv4}
+            self._iface_display_cache = (interface_names, interface_map)
+            
+            if on_done:
+                on_done()
+        
+        self.run_in_background(self.discover_interfaces, apply)
     
-    def refresh_interfaces(self):
-        self.interfaces = []
-        interfaces = self.discover_interfaces_powershell()
+    def discover_interfaces(self) -> List[Dict]:
+        if self.legacy:
+            interfaces = self.discover_interfaces_powershell()
+        else:
+            interfaces = self.discover_interfaces_iphlpapi()
         if not interfaces:
             interfaces = self.discover_interfaces_netsh()
-        self.interfaces = interfaces
+        return interfaces
+    
+    def discover_interfaces_iphlpapi(self) -> List[Dict]:
+        interfaces = []
+        try:
+            get_adapters = ctypes.windll.iphlpapi.GetAdaptersAddresses
+            flags = _GAA_FLAG_SKIP_ANYCAST | _GAA_FLAG_SKIP_MULTICAST | _GAA_FLAG_SKIP_DNS_SERVER
+            size = ctypes.c_ulong(16 * 1024)
+            while True:
+                buf = ctypes.create_string_buffer(size.value)
+                ret = get_adapters(socket.AF_INET, flags, None, buf, ctypes.byref(size))
+                if ret != _ERROR_BUFFER_OVERFLOW:
+                    break
+            if ret != 0:
+                raise ctypes.WinError(ret)
+            
+            adapter = ctypes.cast(buf, ctypes.POINTER(_IP_ADAPTER_ADDRESSES))
+            while adapter:
+                entry = adapter.contents
+                ipv4 = ""
+                unicast = entry.FirstUnicastAddress
+                if unicast and unicast.contents.Address.lpSockaddr:
+                    ipv4 = socket.inet_ntoa(bytes(unicast.contents.Address.lpSockaddr.contents.sin_addr))
+                
+                interfaces.append({
+                    'index': str(entry.IfIndex),
+                    'name': entry.FriendlyName or 'Unknown',
+                    'state': "Connected" if entry.OperStatus == _IF_OPER_STATUS_UP else "Disconnected",
+                    'ipv4': ipv4
+                })
+                adapter = entry.Next
+        except Exception as e:
+            log_command("GetAdaptersAddresses interface discovery", "", str(e), False)
+        
+        return interfaces
     
     def discover_interfaces_powershell(self) -> List[Dict]:
         interfaces = []
         try:
             ps_script = '''
+            [Console]::OutputEncoding = New-Object System.Text.UTF8Encoding $false
             $interfaces = Get-NetIPInterface -AddressFamily IPv4 | Select-Object ifIndex, InterfaceAlias, ConnectionState
             $addresses = Get-NetIPAddress -AddressFamily IPv4 | Select-Object ifIndex, IPAddress
             
@@ -1395,13 +2112,9 @@ class RouteManagerApp:
             $result | ConvertTo-Json -Compress
             '''
             
-            result = subprocess.run(
-                ["powershell", "-NoProfile", "-Command", ps_script],
-                capture_output=True, text=True, timeout=30
-            )
-            
-            if result.returncode == 0 and result.stdout.strip():
-                data = json.loads(result.stdout.strip())
+            output = self._ps.run(ps_script).strip()
+            if output:
+                data = json_loads(output)
                 if isinstance(data, dict):
                     data = [data]
                 
@@ -1422,7 +2135,7 @@ class RouteManagerApp:
         try:
             result = subprocess.run(
                 ["netsh", "interface", "ipv4", "show", "interfaces"],
-                capture_output=True, text=True, timeout=30
+                capture_output=True, text=True, timeout=30, creationflags=_NO_WINDOW
             )
             
             if result.returncode == 0:
@@ -1464,115 +2177,159 @@ class RouteManagerApp:
             self.root.after_cancel(self.auto_refresh_job)
             self.auto_refresh_job = None
     
+    def start_route_watcher(self):
+        try:
+            iphlpapi = ctypes.windll.iphlpapi
+            callback_type = ctypes.WINFUNCTYPE(None, ctypes.c_void_p, ctypes.c_void_p, ctypes.c_int)
+        except AttributeError:
+            return
+        
+        callback = callback_type(lambda context, row, notification_type: self._routes_changed.set())
+        handle = ctypes.c_void_p()
+        ret = iphlpapi.NotifyRouteChange2(socket.AF_INET, callback, None, False, ctypes.byref(handle))
+        if ret != 0:
+            log_command("NotifyRouteChange2", "", f"error {ret}", False)
+            return
+        
+        self._route_notify = (callback, handle)
+        atexit.register(iphlpapi.CancelMibChangeNotify2, handle)
+    
+    def on_root_map(self, event):
+        if event.widget is not self.root:
+            return
+        self._visible = True
+        self.resume_auto_refresh()
+    
+    def on_dialog_destroyed(self, event, dialog):
+        if event.widget is not dialog:
+            return
+        self._open_dialogs -= 1
+        if not self._open_dialogs:
+            self.resume_auto_refresh()
+    
+    def resume_auto_refresh(self):
+        if self._auto_refresh_paused:
+            self._auto_refresh_paused = False
+            self.auto_refresh_tick()
+    
+    def on_root_unmap(self, event):
+        if event.widget is self.root:
+            self._visible = False
+    
     def auto_refresh_tick(self):
-        if self.auto_refresh_enabled:
-            self.refresh_routes()
-            self.auto_refresh_job = self.root.after(self.auto_refresh_interval, self.auto_refresh_tick)
+        self.auto_refresh_job = None
+        if not self._visible or self._open_dialogs:
+            self._auto_refresh_paused = True
+            return
+        if not self.auto_refresh_enabled:
+            return
+        if self._route_notify is not None and not self._routes_changed.is_set():
+            self.schedule_auto_refresh()
+            return
+        self._routes_changed.clear()
+        self.refresh_routes(on_done=self.schedule_auto_refresh)
+    
+    def schedule_auto_refresh(self):
+        if self.auto_refresh_enabled and self.auto_refresh_job is None:
+            interval = ROUTE_EVENT_POLL_MS if self._route_notify is not None else self.auto_refresh_interval
+            self.auto_refresh_job = self.root.after(interval, self.auto_refresh_tick)
     
-    def refresh_routes(self):
+    def refresh_routes(self, on_done=None):
+        if on_done is not None:
+            self._routes_waiters.append(on_done)
+        if self._routes_busy:
+            self._routes_stale = True
+            return
+        self._routes_busy = True
+        self._routes_stale = False
+        self.run_in_background(self.fetch_routes, self.apply_routes)
+    
+    def fetch_routes(self) -> Optional[List[Route]]:
         try:
-            result = subprocess.run(
+            proc = subprocess.Popen(
                 ["route", "print", "-4"],
-                capture_output=True, text=True, timeout=30
+                stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True, creationflags=_NO_WINDOW
             )
-            
-            if result.returncode == 0:
-                routes = self.parse_route_print(result.stdout)
-                persistent_routes = self.get_persistent_routes()
-                
-                self.all_routes_data = []
-                for route in routes:
-                    is_persistent = "Unknown"
-                    dest = route.get('destination', '')
-                    if dest in persistent_routes:
-                        is_persistent = "Yes"
-                    elif dest not in ['0.0.0.0', '127.0.0.0', '127.0.0.1', '224.0.0.0', '255.255.255.255']:
-                        is_persistent = "No"
-                    
-                    self.all_routes_data.append({
-                        'destination': route.get('destination', ''),
-                        'netmask': route.get('netmask', ''),
-                        'gateway': route.get('gateway', ''),
-                        'interface': route.get('interface', ''),
-                        'metric': route.get('metric', ''),
-                        'persistent': is_persistent
-                    })
-                
-                self.update_tab_counts()
-                self.filter_routes()
         except Exception:
-            pass
-    
-    def parse_route_print(self, output: str) -> List[Dict]:
-        routes = []
-        lines = output.split('\n')
+            return None
         
-        in_active_routes = False
-        for line in lines:
-            if 'Active Routes:' in line:
-                in_active_routes = True
-                continue
-            if 'Persistent Routes:' in line:
-                break
-            if not in_active_routes:
-                continue
-            if 'Network Destination' in line:
-                continue
-            if '==' in line:
-                continue
-            
-            line = line.strip()
-            if not line:
-                continue
-            
-            parts = line.split()
-            if len(parts) >= 5:
-                try:
-                    if validate_ipv4(parts[0]) or parts[0] == '0.0.0.0':
-                        routes.append({
-                            'destination': parts[0],
-                            'netmask': parts[1],
-                            'gateway': parts[2],
-                            'interface': parts[3],
-                            'metric': parts[4] if len(parts) > 4 else ''
-                        })
-                except Exception:
-                    continue
+        killed = threading.Event()
         
-        return routes
-    
-    def get_persistent_routes(self) -> set:
-        persistent = set()
+        def kill():
+            killed.set()
+            proc.kill()
+        
+        timer = threading.Timer(30, kill)
+        timer.start()
+        routes, closed = None, False
         try:
-            result = subprocess.run(
-                ["route", "print", "-4"],
-                capture_output=True, text=True, timeout=30
-            )
-            
-            if result.returncode == 0:
-                lines = result.stdout.split('\n')
-                in_persistent = False
-                for line in lines:
-                    if 'Persistent Routes:' in line:
-                        in_persistent = True
-                        continue
-                    if in_persistent:
-                        if '==' in line:
-                            continue
-                        if 'None' in line:
-                            break
-                        parts = line.strip().split()
-                        if len(parts) >= 1 and (validate_ipv4(parts[0]) or parts[0] == '0.0.0.0'):
-                            persistent.add(parts[0])
+            routes, closed = self.parse_route_print(proc.stdout)
         except Exception:
             pass
-        
-        return persistent
+        finally:
+            timer.cancel()
+            if closed:
+                proc.terminate()
+            proc.stdout.close()
+            returncode = proc.wait()
+        
+        if killed.is_set() or (not closed and returncode != 0):
+            return None
+        return routes
+    
+    def apply_routes(self, routes_data: Optional[List[Route]]):
+        self._routes_busy = False
+        if routes_data is not None:
+            self.all_routes_data = routes_data
+            self.update_tab_counts()
+            self.filter_routes()
+        
+        if self._routes_stale:
+            self.refresh_routes()
+            return
+        waiters, self._routes_waiters = self._routes_waiters, []
+        for callback in waiters:
+            callback()
+    
+    def parse_route_print(self, lines):
+        active = []
+        persistent = set()
+        section = None
+        closed = False
+        for line in lines:
+            if section is None:
+                if 'Active Routes:' in line:
+                    section = "active"
+            elif section == "active":
+                if 'Persistent Routes:' in line:
+                    section = "persistent"
+                    continue
+                match = _ROUTE_LINE.match(line)
+                if match:
+                    active.append(match.groups())
+            else:
+                if line.startswith('='):
+                    closed = True
+                    break
+                match = _PERSISTENT_LINE.match(line)
+                if match:
+                    persistent.add(match.group(1))
+        
+        routes = [
+            Route(dest, mask, gateway, iface, metric,
+                  "Yes" if dest in persistent else ("No" if dest not in _SPECIAL_DESTS else "Unknown"))
+            for dest, mask, gateway, iface, metric in active
+        ]
+        return routes, closed
 
 
 def main():
+    parser = argparse.ArgumentParser(description=APP_TITLE)
+    parser.add_argument("--legacy", action="store_true", help="discover interfaces with PowerShell instead of the IP Helper API")
+    args = parser.parse_args()
+    
     root = tk.Tk()
-    app = RouteManagerApp(root)
+    app = RouteManagerApp(root, legacy=args.legacy)
     root.mainloop()
 
 